@@ -1,16 +1,42 @@
-from flask import Flask, request, jsonify,render_template
+from flask import Flask, request, jsonify,render_template, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import click
+import orjson
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+import itertools
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from database import db
 from models import EmailAnalysis
 from auth_routes import auth_bp
 
 from services.tone_service import analyze_tone
 from services.clarity_service import analyze_clarity
-from services.rewrite_service import rewrite_text
+from services.rewrite_service import rewrite_text, rewrite_text_stream
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize responses with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 # ---------- FRONTEND ROUTES ----------
 
 @app.route("/")
@@ -42,16 +68,128 @@ app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key")
 
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_pre_ping": True,   # drop connections the managed DB closed
+    "pool_recycle": 1800,
+    "pool_use_lifo": True    # keep a small set of hot connections warm
+}
 
 db.init_app(app)
 
-with app.app_context():
+
+def upgrade_clarity_issues_column():
+    """
+    Convert email_analyses.clarity_issues from the old TEXT column to JSONB.
+    create_all() never alters existing tables, so this runs as part of init-db.
+    Returns True if the column was converted.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return False  # generic JSON is stored as text elsewhere already
+
+    columns = {
+        c["name"]: c["type"]
+        for c in db.inspect(db.engine).get_columns("email_analyses")
+    }
+    if isinstance(columns.get("clarity_issues"), (type(None), JSONB)):
+        return False
+
+    with db.engine.begin() as conn:
+        conn.execute(db.text(
+            "ALTER TABLE email_analyses "
+            "ALTER COLUMN clarity_issues TYPE jsonb USING clarity_issues::jsonb"
+        ))
+    return True
+
+
+@app.cli.command("init-db")
+def init_db():
+    """Create database tables (run once per deploy, not per worker)."""
     db.create_all()
+    click.echo("Database tables created.")
+
+    if upgrade_clarity_issues_column():
+        click.echo("Converted email_analyses.clarity_issues to JSONB.")
 
 # ---------- REGISTER AUTH ----------
 app.register_blueprint(auth_bp)
 
+# ---------- DASHBOARD CACHE ----------
+# The dashboard is polled; counts only change when a user's analyses do
+DASHBOARD_CACHE_TTL = 30
+DASHBOARD_CACHE_SIZE = 1024
+_dashboard_cache = OrderedDict()
+_dashboard_cache_lock = threading.Lock()
+
+# Bumped on every invalidation. dashboard() only caches its counts if the
+# user's generation didn't change while the query ran, so a persist that
+# lands mid-query can't be overwritten by the stale result.
+_dashboard_generations = OrderedDict()
+_dashboard_generation_counter = itertools.count(1)
+_evicted_generation = 0   # users without an entry fall back to this
+
+
+def _dashboard_generation(key):
+    return _dashboard_generations.get(key, _evicted_generation)
+
+
+def invalidate_dashboard(user_id):
+    global _evicted_generation
+    key = str(user_id)
+    with _dashboard_cache_lock:
+        _dashboard_cache.pop(key, None)
+        _dashboard_generations[key] = next(_dashboard_generation_counter)
+        _dashboard_generations.move_to_end(key)
+        if len(_dashboard_generations) > DASHBOARD_CACHE_SIZE:
+            _, _evicted_generation = _dashboard_generations.popitem(last=False)
+
+
 # ---------- ANALYZE ----------
+# Inserts run off the request thread so the response isn't held by the commit
+persist_executor = ThreadPoolExecutor(max_workers=4)
+
+# Last accepted write per user, used to drop per-keystroke bursts
+WRITE_DEBOUNCE_SECONDS = 0.5
+_last_write = OrderedDict()
+_last_write_lock = threading.Lock()
+
+
+def _should_persist(user_id):
+    now = time.monotonic()
+    with _last_write_lock:
+        last = _last_write.get(user_id)
+        if last is not None and now - last < WRITE_DEBOUNCE_SECONDS:
+            return False
+        _last_write[user_id] = now
+        _last_write.move_to_end(user_id)
+        if len(_last_write) > 1024:
+            _last_write.popitem(last=False)
+    return True
+
+
+def _persist_analysis(user_id, text, tone_result, clarity_result):
+    with app.app_context():
+        try:
+            analysis = EmailAnalysis(
+                user_id=user_id,
+                email_text=text,
+                tone=tone_result["label"],
+                confidence=tone_result["confidence"],
+                explanation=tone_result.get("explanation"),
+                clarity_score=clarity_result.get("clarity_score"),
+                clarity_issues=clarity_result.get("issues"),
+                rewritten_text=None
+            )
+
+            db.session.add(analysis)
+            db.session.commit()
+            invalidate_dashboard(user_id)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Saving analysis failed: {e}")
+
+
 @app.route("/analyze/realtime", methods=["POST"])
 def realtime_analysis():
     data = request.json
@@ -64,19 +202,10 @@ def realtime_analysis():
     tone_result = analyze_tone(text)
     clarity_result = analyze_clarity(text)
 
-    analysis = EmailAnalysis(
-        user_id=user_id,
-        email_text=text,
-        tone=tone_result["label"],
-        confidence=tone_result["confidence"],
-        explanation=tone_result.get("explanation"),
-        clarity_score=clarity_result.get("clarity_score"),
-        clarity_issues=json.dumps(clarity_result.get("issues")),
-        rewritten_text=None
-    )
-
-    db.session.add(analysis)
-    db.session.commit()
+    if _should_persist(user_id):
+        persist_executor.submit(
+            _persist_analysis, user_id, text, tone_result, clarity_result
+        )
 
     return jsonify({
         "tone": tone_result,
@@ -85,6 +214,18 @@ def realtime_analysis():
 
 
 # ---------- REWRITE ----------
+def normalize_tone(tone):
+    # ✅ Normalize tone into supported values
+    tone = (tone or "neutral").lower()
+    if tone in ["harsh", "angry", "rude"]:
+        return "harsh"
+    elif tone in ["firm", "urgent"]:
+        return "firm"
+    elif tone in ["polite", "apologetic", "friendly"]:
+        return "polite"
+    return "neutral"
+
+
 @app.route("/rewrite", methods=["POST"])
 def rewrite():
     data = request.get_json(force=True) or {}
@@ -94,17 +235,7 @@ def rewrite():
         return jsonify({"success": False, "rewritten_text": "", "error": "Text is required"}), 400
 
     # ✅ Take tone from frontend
-    tone = (data.get("tone") or "neutral").lower()
-
-    # ✅ Normalize tone into supported values
-    if tone in ["harsh", "angry", "rude"]:
-        tone = "harsh"
-    elif tone in ["firm", "urgent"]:
-        tone = "firm"
-    elif tone in ["polite", "apologetic", "friendly"]:
-        tone = "polite"
-    else:
-        tone = "neutral"
+    tone = normalize_tone(data.get("tone"))
 
     clarity_issues = data.get("clarity_issues") or []
 
@@ -116,7 +247,35 @@ def rewrite():
 
     return jsonify(result), 200
 
+
+@app.route("/rewrite/stream", methods=["POST"])
+def rewrite_stream():
+    data = request.get_json(force=True) or {}
+
+    text = (data.get("text") or "").strip()
+    if not text:
+        return jsonify({"success": False, "rewritten_text": "", "error": "Text is required"}), 400
+
+    tone = normalize_tone(data.get("tone"))
+    clarity_issues = data.get("clarity_issues") or []
+
+    # Server-sent events: one "data:" line per Gemini chunk, then a final done event
+    def events():
+        try:
+            for chunk in rewrite_text_stream(text, tone, clarity_issues):
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            yield f"data: {json.dumps({'done': True, 'success': True})}\n\n"
+        except Exception as e:
+            app.logger.error(f"Gemini Rewrite stream failed: {e}")
+            yield f"data: {json.dumps({'done': True, 'success': False})}\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream")
+
 # ---------- HISTORY ----------
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 100
+
+
 @app.route("/history", methods=["GET"])
 def history():
     user_id = request.args.get("user_id")
@@ -124,19 +283,53 @@ def history():
     if not user_id:
         return jsonify([])
 
-    analyses = EmailAnalysis.query.filter_by(user_id=user_id)\
-        .order_by(EmailAnalysis.created_at.desc())\
+    # Keyset pagination: ?before=<created_at>|<id> of the last row seen&limit=N.
+    # The id breaks ties between rows saved with the same timestamp.
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+        before = request.args.get("before")
+        if before:
+            before_ts, before_id = before.rsplit("|", 1)
+            before = (datetime.fromisoformat(before_ts), int(before_id))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or before cursor"}), 400
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    # Only the columns the preview needs; the body is truncated in SQL
+    query = db.session.query(
+        func.substr(EmailAnalysis.email_text, 1, 120).label("preview"),
+        func.length(EmailAnalysis.email_text).label("tlen"),
+        EmailAnalysis.tone,
+        EmailAnalysis.clarity_issues,
+        EmailAnalysis.created_at,
+        EmailAnalysis.id
+    ).filter(EmailAnalysis.user_id == user_id)
+
+    if before:
+        query = query.filter(
+            tuple_(EmailAnalysis.created_at, EmailAnalysis.id) < before
+        )
+
+    analyses = query.order_by(EmailAnalysis.created_at.desc(), EmailAnalysis.id.desc())\
+        .limit(limit)\
         .all()
 
-    return jsonify([
+    response = jsonify([
         {
-            "text": a.email_text[:120] + ("..." if len(a.email_text) > 120 else ""),
+            "text": a.preview + ("..." if a.tlen > 120 else ""),
             "tone": a.tone,
-            "clarityIssues": json.loads(a.clarity_issues),
+            "clarityIssues": a.clarity_issues,
             "time": a.created_at.strftime("%Y-%m-%d %H:%M")
         }
         for a in analyses
     ])
+
+    # A full page means there may be more; the client passes this back as ?before=
+    if len(analyses) == limit:
+        last = analyses[-1]
+        response.headers["X-Next-Cursor"] = f"{last.created_at.isoformat()}|{last.id}"
+
+    return response
 # ---------- CLEAR HISTORY ----------
 @app.route("/history/clear", methods=["DELETE"])
 def clear_history():
@@ -147,6 +340,7 @@ def clear_history():
 
     EmailAnalysis.query.filter_by(user_id=user_id).delete()
     db.session.commit()
+    invalidate_dashboard(user_id)
 
     return jsonify({"message": "History cleared successfully"})
 
@@ -155,16 +349,42 @@ def clear_history():
 @app.route("/dashboard", methods=["GET"])
 def dashboard():
     user_id = request.args.get("user_id")
+    key = str(user_id)
+
+    with _dashboard_cache_lock:
+        cached = _dashboard_cache.get(key)
+        if cached and time.monotonic() - cached[0] >= DASHBOARD_CACHE_TTL:
+            del _dashboard_cache[key]
+            cached = None
+        generation = _dashboard_generation(key)
+    if cached:
+        return jsonify(cached[1])
+
+    counts = dict(
+        db.session.query(EmailAnalysis.tone, func.count())
+        .filter_by(user_id=user_id)
+        .group_by(EmailAnalysis.tone)
+        .all()
+    )
 
-    analyses = EmailAnalysis.query.filter_by(user_id=user_id).all()
+    payload = {
+        "total": sum(counts.values()),
+        "polite": counts.get("polite", 0),
+        "neutral": counts.get("neutral", 0),
+        "harsh": counts.get("harsh", 0)
+    }
 
-    return jsonify({
-        "total": len(analyses),
-        "polite": sum(a.tone == "polite" for a in analyses),
-        "neutral": sum(a.tone == "neutral" for a in analyses),
-        "harsh": sum(a.tone == "harsh" for a in analyses)
-    })
+    with _dashboard_cache_lock:
+        if _dashboard_generation(key) == generation:
+            _dashboard_cache[key] = (time.monotonic(), payload)
+            _dashboard_cache.move_to_end(key)
+            if len(_dashboard_cache) > DASHBOARD_CACHE_SIZE:
+                _dashboard_cache.popitem(last=False)
+
+    return jsonify(payload)
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    with app.app_context():
+        db.create_all()
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1")
@@ -1,10 +1,35 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from database import db
 from models import User
 
 auth_bp = Blueprint("auth", __name__)
 
+ph = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+
+def verify_password(user, password):
+    """Check a password, upgrading legacy werkzeug or outdated argon2 hashes."""
+    if not user.password_hash.startswith("$argon2"):
+        # Accounts created before the switch to argon2
+        if not check_password_hash(user.password_hash, password):
+            return False
+        user.password_hash = ph.hash(password)
+        db.session.commit()
+        return True
+
+    try:
+        ph.verify(user.password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+    if ph.check_needs_rehash(user.password_hash):
+        user.password_hash = ph.hash(password)
+        db.session.commit()
+    return True
+
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
     data = request.get_json()
@@ -25,7 +50,7 @@ def signup():
     user = User(
         name=name,
         email=email,
-        password_hash=generate_password_hash(password)
+        password_hash=ph.hash(password)
     )
 
     db.session.add(user)
@@ -46,7 +71,7 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not verify_password(user, password):
         return jsonify({"error": "Invalid credentials"}), 401
 
     return jsonify({
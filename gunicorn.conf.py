@@ -0,0 +1,16 @@
+import multiprocessing
+import os
+
+# Loaded automatically by gunicorn from the working directory
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# /rewrite waits on Gemini and every route waits on the DB, so threaded
+# workers keep serving while others block on I/O
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 60
+
+# Import the app (and warm the models in wsgi.py) once in the master so
+# workers share those pages instead of each loading their own copy
+preload_app = True
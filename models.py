@@ -1,4 +1,5 @@
 from database import db
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 
 class User(db.Model):
@@ -25,8 +26,15 @@ class EmailAnalysis(db.Model):
     explanation = db.Column(db.Text)
 
     clarity_score = db.Column(db.Integer)
-    clarity_issues = db.Column(db.Text)  # JSON string
+    # JSONB on Postgres, plain JSON elsewhere (e.g. a local SQLite DB)
+    clarity_issues = db.Column(db.JSON().with_variant(JSONB, "postgresql"))
     rewritten_text = db.Column(db.Text)
     
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Serves the per-user, newest-first lookups in /history and /dashboard
+        # id breaks ties for the (created_at, id) keyset cursor in /history
+        db.Index("ix_analyses_user_created", user_id, created_at.desc(), id.desc()),
+    )
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Dict, Any, List
 import textstat
 import warnings
@@ -25,12 +26,28 @@ PASSIVE_PATTERNS = [
     r"\bhas\s+been\s+\w+ed\b",
 ]
 
+# Compiled once at import instead of on every request
+_PASSIVE_RE = [re.compile(p) for p in PASSIVE_PATTERNS]
+_SENT_SPLIT = re.compile(r'[.!?]')
+
+# Call-to-action verbs as one alternation. Like the tone markers these are
+# plain substrings, not whole tokens, so "needed" or "confirmed" still count.
+_CTA_RE = re.compile("|".join(map(re.escape, CALL_TO_ACTION_VERBS)))
+
 # ==============================
 # 🔹 UTILS
 # ==============================
 
 def split_sentences(text: str) -> List[str]:
-    return [s.strip() for s in re.split(r'[.!?]', text) if s.strip()]
+    return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
+
+@lru_cache(maxsize=2048)
+def readability_score(text: str) -> float:
+    # Realtime analysis re-sends the same text as the user types
+    try:
+        return textstat.flesch_reading_ease(text)
+    except Exception:
+        return 50  # fallback
 
 # ==============================
 # 🔹 MAIN ANALYZER
@@ -45,6 +62,7 @@ def analyze_clarity(text: str) -> Dict[str, Any]:
         }
 
     issues = []
+    lower = text.lower()
     sentences = split_sentences(text)
     sentence_count = len(sentences)
     word_count = len(text.split())
@@ -59,28 +77,23 @@ def analyze_clarity(text: str) -> Dict[str, Any]:
         issues.append("Message is too long. Consider shortening it.")
 
     # ---------- Readability ----------
-    try:
-        readability = textstat.flesch_reading_ease(text)
-    except:
-        readability = 50  # fallback
+    readability = readability_score(text)
 
     if readability < 50:
         issues.append("Text is difficult to read. Use simpler sentences.")
 
     # ---------- Vague language ----------
-    vague_hits = [w for w in VAGUE_WORDS if w in text.lower()]
+    vague_hits = [w for w in VAGUE_WORDS if w in lower]
     if vague_hits:
         issues.append("Vague wording detected. Be more specific.")
 
     # ---------- Passive voice ----------
-    passive_hits = any(
-        re.search(p, text.lower()) for p in PASSIVE_PATTERNS
-    )
+    passive_hits = any(r.search(lower) for r in _PASSIVE_RE)
     if passive_hits:
         issues.append("Passive voice reduces clarity. Use active voice.")
 
     # ---------- Call to action ----------
-    if not any(v in text.lower() for v in CALL_TO_ACTION_VERBS):
+    if not _CTA_RE.search(lower):
         issues.append("No clear action or request stated.")
 
     # ==============================
@@ -114,7 +127,7 @@ def analyze_clarity(text: str) -> Dict[str, Any]:
         score -= len(vague_hits) * 4   # lighter penalty
 
     # 5. Short aggressive messages (new rule)
-    if word_count < 10 and not any(v in text.lower() for v in ["please", "could", "would"]):
+    if word_count < 10 and not any(v in lower for v in ["please", "could", "would"]):
         issues.append("Message too short and abrupt.")
         score -= 25
     score = max(0, min(100, int(score)))
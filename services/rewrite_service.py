@@ -1,7 +1,9 @@
 import os
 import time
 import logging
-from typing import Dict, Optional, List
+from functools import lru_cache
+from typing import Dict, Optional, List, Iterator, Tuple
+import httpx
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -21,7 +23,19 @@ if not GEMINI_API_KEY:
 # ============================================================
 # 🔹 CLIENT CONFIG
 # ============================================================
-client = genai.Client(api_key=GEMINI_API_KEY)
+# One client per process; its httpx pool keeps connections to Gemini alive
+# between rewrites so each call skips the TCP + TLS handshake
+client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(
+        client_args={
+            "limits": httpx.Limits(
+                max_keepalive_connections=20,
+                keepalive_expiry=120,
+            )
+        }
+    ),
+)
 
 # ✅ same model you used successfully
 MODEL_NAME = "models/gemini-2.5-flash"
@@ -29,6 +43,24 @@ MODEL_NAME = "models/gemini-2.5-flash"
 # ============================================================
 # 🔹 RETRY LOGIC
 # ============================================================
+def _is_transient(e: Exception) -> bool:
+    err = str(e).upper()
+    return any(x in err for x in ["503", "OVERLOADED", "UNAVAILABLE", "429", "LIMIT"])
+
+
+@lru_cache(maxsize=32)
+def _build_config(system_instruction: str, temperature: float, max_tokens: int):
+    # Same arguments on every rewrite, so the config object is built once
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+        # Thinking tokens count against max_output_tokens; a 2-line
+        # rewrite doesn't need them
+        thinking_config=types.ThinkingConfig(thinking_budget=0),
+    )
+
+
 def generate_with_retry(
     prompt: str,
     system_instruction: str,
@@ -45,19 +77,12 @@ def generate_with_retry(
             response = client.models.generate_content(
                 model=MODEL_NAME,
                 contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                )
+                config=_build_config(system_instruction, temperature, max_tokens)
             )
             return response.text.strip()
 
         except Exception as e:
-            err = str(e).upper()
-            is_transient = any(x in err for x in ["503", "OVERLOADED", "UNAVAILABLE", "429", "LIMIT"])
-
-            if is_transient and attempt < retries:
+            if _is_transient(e) and attempt < retries:
                 delay = base_delay * (2 ** (attempt - 1))
                 logger.warning(f"{MODEL_NAME} overloaded/rate-limited. Retry {attempt}/{retries} in {delay:.1f}s...")
                 time.sleep(delay)
@@ -65,17 +90,51 @@ def generate_with_retry(
 
             raise  # real failure or last attempt
 
+
+def stream_with_retry(
+    prompt: str,
+    system_instruction: str,
+    retries: int = 5,
+    base_delay: float = 2.0,
+    temperature: float = 0.4,
+    max_tokens: int = 300,
+) -> Iterator[str]:
+    """
+    Streaming variant of generate_with_retry. Only retries if the failure
+    happens before the first chunk was yielded.
+    """
+    for attempt in range(1, retries + 1):
+        started = False
+        try:
+            stream = client.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=prompt,
+                config=_build_config(system_instruction, temperature, max_tokens)
+            )
+            for chunk in stream:
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+            return
+
+        except Exception as e:
+            if _is_transient(e) and not started and attempt < retries:
+                delay = base_delay * (2 ** (attempt - 1))
+                logger.warning(f"{MODEL_NAME} overloaded/rate-limited. Retry {attempt}/{retries} in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            raise  # real failure, mid-stream failure or last attempt
+
 # ============================================================
-# 🔹 MAIN REWRITE LOGIC
+# 🔹 PROMPT
 # ============================================================
-def rewrite_text(
+def build_rewrite_prompt(
     text: str,
     tone: str = "polite",
     clarity_issues: Optional[List[str]] = None
-) -> Dict:
-    if not text or not text.strip():
-        return {"rewritten_text": "", "success": False}
-
+) -> Tuple[str, str]:
+    """Return (system_instruction, user_prompt) for a rewrite request."""
     # ✅ Tone mapping (kept, but aligned with same rewrite format)
     tone_map = {
         "harsh": "Professional and calm. Remove anger/blame.",
@@ -111,6 +170,25 @@ Tone guidance: {tone_instruction}
 Message: "{text}"
 """.strip()
 
+    return system_instruction, user_prompt
+
+# ============================================================
+# 🔹 MAIN REWRITE LOGIC
+# ============================================================
+# The prompt asks for under 2 lines, so a small budget is plenty
+REWRITE_MAX_TOKENS = 120
+
+
+def rewrite_text(
+    text: str,
+    tone: str = "polite",
+    clarity_issues: Optional[List[str]] = None
+) -> Dict:
+    if not text or not text.strip():
+        return {"rewritten_text": "", "success": False}
+
+    system_instruction, user_prompt = build_rewrite_prompt(text, tone, clarity_issues)
+
     try:
         rewritten = generate_with_retry(
             prompt=user_prompt,
@@ -118,7 +196,7 @@ Message: "{text}"
             retries=5,
             base_delay=2.0,
             temperature=0.4,
-            max_tokens=3000
+            max_tokens=REWRITE_MAX_TOKENS
         )
 
         return {
@@ -134,3 +212,21 @@ Message: "{text}"
             "success": False,
             "model": MODEL_NAME
         }
+
+
+def rewrite_text_stream(
+    text: str,
+    tone: str = "polite",
+    clarity_issues: Optional[List[str]] = None
+) -> Iterator[str]:
+    """Yield the rewritten text chunk by chunk as Gemini generates it."""
+    system_instruction, user_prompt = build_rewrite_prompt(text, tone, clarity_issues)
+
+    yield from stream_with_retry(
+        prompt=user_prompt,
+        system_instruction=system_instruction,
+        retries=5,
+        base_delay=2.0,
+        temperature=0.4,
+        max_tokens=REWRITE_MAX_TOKENS
+    )
@@ -1,6 +1,12 @@
 import os
 import re
+import queue
+import threading
 import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import Dict, Any
 
 # =============================================================================
@@ -11,25 +17,34 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_DIR = os.path.join(BASE_DIR, "..", "ml")
 
 # =============================================================================
-# 🔹 LOAD MODELS (SAFE)
+# 🔹 LOAD MODELS (SAFE, LAZY)
 # =============================================================================
 
-business_model = None
-business_vectorizer = None
-complaint_model = None
-complaint_vectorizer = None
+# Loaded on first prediction rather than at import. mmap_mode lets joblib map
+# the numpy arrays from disk so processes on the same host share the pages.
 
-try:
-    business_model = joblib.load(os.path.join(ML_DIR, "tone_model.pkl"))
-    business_vectorizer = joblib.load(os.path.join(ML_DIR, "vectorizer.pkl"))
-except Exception as e:
-    print("⚠️ Business model load failed:", e)
+@lru_cache(maxsize=None)
+def get_business_model():
+    try:
+        return (
+            joblib.load(os.path.join(ML_DIR, "tone_model.pkl"), mmap_mode="r"),
+            joblib.load(os.path.join(ML_DIR, "vectorizer.pkl"), mmap_mode="r"),
+        )
+    except Exception as e:
+        print("⚠️ Business model load failed:", e)
+        return None, None
 
-try:
-    complaint_model = joblib.load(os.path.join(ML_DIR, "complaint_tone_model.pkl"))
-    complaint_vectorizer = joblib.load(os.path.join(ML_DIR, "complaint_vectorizer.pkl"))
-except Exception as e:
-    print("⚠️ Complaint model load failed:", e)
+
+@lru_cache(maxsize=None)
+def get_complaint_model():
+    try:
+        return (
+            joblib.load(os.path.join(ML_DIR, "complaint_tone_model.pkl"), mmap_mode="r"),
+            joblib.load(os.path.join(ML_DIR, "complaint_vectorizer.pkl"), mmap_mode="r"),
+        )
+    except Exception as e:
+        print("⚠️ Complaint model load failed:", e)
+        return None, None
 
 # =============================================================================
 # 🔹 RULE-BASED SAFETY NET (KEEP THIS)
@@ -66,6 +81,19 @@ NEGATIVE_KEYWORDS = {
     "problem", "issue", "delay", "no response"
 }
 
+# Each pattern list / marker set compiled into one alternation so a check is
+# a single scan. Markers stay plain substrings (not whole tokens) so that
+# inflections like "appreciated" or "issues" still match.
+def _alternation(patterns):
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+_ACCUSATORY_RE = _alternation(ACCUSATORY_PATTERNS)
+_COMMANDING_RE = _alternation(COMMANDING_PATTERNS)
+_POLITE_RE = _alternation(map(re.escape, POLITE_MARKERS))
+_APOLOGY_RE = _alternation(map(re.escape, APOLOGY_MARKERS))
+_URGENT_RE = _alternation(map(re.escape, URGENT_WORDS))
+_NEGATIVE_RE = _alternation(map(re.escape, NEGATIVE_KEYWORDS))
+
 # =============================================================================
 # 🔹 RULE ANALYSIS
 # =============================================================================
@@ -73,12 +101,12 @@ NEGATIVE_KEYWORDS = {
 def rule_based_tone(text: str) -> Dict[str, Any]:
     t = text.lower()
 
-    has_accusatory = any(re.search(p, t) for p in ACCUSATORY_PATTERNS)
-    has_commanding = any(re.search(p, t) for p in COMMANDING_PATTERNS)
-    has_polite = any(p in t for p in POLITE_MARKERS)
-    has_apology = any(p in t for p in APOLOGY_MARKERS)
-    has_urgent = any(p in t for p in URGENT_WORDS)
-    has_negative = any(p in t for p in NEGATIVE_KEYWORDS)
+    has_accusatory = bool(_ACCUSATORY_RE.search(t))
+    has_commanding = bool(_COMMANDING_RE.search(t))
+    has_polite = bool(_POLITE_RE.search(t))
+    has_apology = bool(_APOLOGY_RE.search(t))
+    has_urgent = bool(_URGENT_RE.search(t))
+    has_negative = bool(_NEGATIVE_RE.search(t))
 
     if has_accusatory:
         label = "harsh"
@@ -127,15 +155,118 @@ def is_customer_support_email(text: str) -> bool:
 # 🔹 SAFE ML HELPERS
 # =============================================================================
 
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    return scores / scores.sum(axis=1, keepdims=True)
+
+
+def linear_predict_proba(model, X):
+    """
+    LogisticRegression.predict_proba as plain numpy, skipping sklearn's
+    per-call input validation. Mirrors sklearn's ovr/multinomial choice;
+    any other model type goes through predict_proba unchanged.
+    """
+    if not isinstance(model, LogisticRegression):
+        return model.predict_proba(X)
+
+    scores = np.asarray(X @ model.coef_.T, dtype=np.float64) + model.intercept_
+
+    multi_class = getattr(model, "multi_class", "auto")
+    ovr = multi_class in ("ovr", "warn") or (
+        multi_class in ("auto", "deprecated")
+        and (len(model.classes_) <= 2 or model.solver == "liblinear")
+    )
+
+    if scores.shape[1] == 1:
+        if not ovr:
+            return _softmax(np.hstack([-scores, scores]))
+        pos = 1.0 / (1.0 + np.exp(-scores))
+        return np.hstack([1.0 - pos, pos])
+
+    if not ovr:
+        return _softmax(scores)
+    probs = 1.0 / (1.0 + np.exp(-scores))
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+class MicroBatcher:
+    """
+    Scores texts from concurrent requests with a single transform +
+    predict_proba call. It never waits for a batch to fill: each round takes
+    whatever is already queued, so a lone request is scored immediately.
+    """
+
+    def __init__(self, model, vectorizer, max_batch=32):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Started lazily (and again after a fork) since threads don't survive fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, daemon=True).start()
+                self._pid = os.getpid()
+
+    def predict(self, text, timeout=5.0):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout=timeout)
+
+    def _run(self):
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+
+            texts = [text for text, _ in batch]
+            try:
+                X = self.vectorizer.transform(texts)
+                # predict() would recompute the same scores; derive it instead
+                all_probs = linear_predict_proba(self.model, X)
+                idx = np.argmax(all_probs, axis=1)
+                preds = self.model.classes_[idx]
+                probs = all_probs[np.arange(len(idx)), idx]
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), pred, prob in zip(batch, preds, probs):
+                future.set_result((pred, round(float(prob), 2)))
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def _get_batcher(model, vectorizer):
+    key = (id(model), id(vectorizer))
+    batcher = _batchers.get(key)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.setdefault(key, MicroBatcher(model, vectorizer))
+    return batcher
+
+
 def safe_ml_predict(model, vectorizer, text):
     if model is None or vectorizer is None:
         return None, 0.0
 
     try:
-        X = vectorizer.transform([text])
-        pred = model.predict(X)[0]
-        prob = max(model.predict_proba(X)[0])
-        return pred, round(float(prob), 2)
+        return _get_batcher(model, vectorizer).predict(text)
     except Exception as e:
         print("⚠️ ML prediction failed:", e)
         return None, 0.0
@@ -169,12 +300,12 @@ def analyze_tone(text: str) -> Dict[str, Any]:
     # 3️⃣ ML (SAFE)
     if is_complaint:
         ml_label, ml_conf = safe_ml_predict(
-            complaint_model, complaint_vectorizer, text
+            *get_complaint_model(), text
         )
         model_used = "customer_support"
     else:
         ml_label, ml_conf = safe_ml_predict(
-            business_model, business_vectorizer, text
+            *get_business_model(), text
         )
         model_used = "business_email"
 
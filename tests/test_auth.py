@@ -0,0 +1,49 @@
+from werkzeug.security import generate_password_hash
+
+from auth_routes import ph
+from database import db
+from models import User
+
+
+def test_login_upgrades_legacy_werkzeug_hash(client):
+    user = User(
+        name="Legacy",
+        email="legacy@example.com",
+        password_hash=generate_password_hash("secret")
+    )
+    db.session.add(user)
+    db.session.commit()
+
+    res = client.post("/login", json={"email": "legacy@example.com", "password": "secret"})
+
+    assert res.status_code == 200
+    assert db.session.get(User, user.id).password_hash.startswith("$argon2")
+
+
+def test_login_rejects_wrong_password_for_legacy_hash(client):
+    user = User(
+        name="Legacy",
+        email="legacy@example.com",
+        password_hash=generate_password_hash("secret")
+    )
+    db.session.add(user)
+    db.session.commit()
+
+    res = client.post("/login", json={"email": "legacy@example.com", "password": "wrong"})
+
+    assert res.status_code == 401
+    assert not db.session.get(User, user.id).password_hash.startswith("$argon2")
+
+
+def test_login_rejects_corrupted_argon2_hash(client):
+    user = User(
+        name="Corrupt",
+        email="corrupt@example.com",
+        password_hash=ph.hash("secret")[:-10]
+    )
+    db.session.add(user)
+    db.session.commit()
+
+    res = client.post("/login", json={"email": "corrupt@example.com", "password": "secret"})
+
+    assert res.status_code == 401
@@ -0,0 +1,25 @@
+import pytest
+
+from services.clarity_service import analyze_clarity
+
+NO_ACTION = "No clear action or request stated."
+VAGUE = "Vague wording detected. Be more specific."
+
+
+# Markers match as substrings, so inflected verbs still count as a request
+@pytest.mark.parametrize("text", [
+    "I needed the files you requested yesterday.",
+    "The invoice was updated and confirmed by finance.",
+    "Could you send the report.",
+])
+def test_inflected_call_to_action_counts(text):
+    assert NO_ACTION not in analyze_clarity(text)["issues"]
+
+
+def test_missing_call_to_action_is_flagged():
+    assert NO_ACTION in analyze_clarity("The meeting is on Tuesday at noon.")["issues"]
+
+
+def test_vague_words_are_flagged():
+    result = analyze_clarity("Please send the stuff and other things soon.")
+    assert VAGUE in result["issues"]
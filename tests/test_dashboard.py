@@ -0,0 +1,98 @@
+from sqlalchemy import event
+
+import app as app_module
+from database import db
+from models import User, EmailAnalysis
+
+
+class FakeTime:
+    now = 1000.0
+
+    @classmethod
+    def monotonic(cls):
+        return cls.now
+
+
+def _add_analysis(user_id, tone="polite"):
+    db.session.add(EmailAnalysis(user_id=user_id, email_text="hi", tone=tone, clarity_issues=[]))
+    db.session.commit()
+
+
+def _make_user():
+    user = User(name="A", email="a@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _setup(monkeypatch):
+    app_module._dashboard_cache.clear()
+    app_module._dashboard_generations.clear()
+    monkeypatch.setattr(app_module, "time", FakeTime)
+
+
+def test_dashboard_cache_is_bounded(client, monkeypatch):
+    _setup(monkeypatch)
+    monkeypatch.setattr(app_module, "DASHBOARD_CACHE_SIZE", 3)
+
+    for user_id in range(5):
+        assert client.get(f"/dashboard?user_id={user_id}").status_code == 200
+
+    assert list(app_module._dashboard_cache) == ["2", "3", "4"]
+
+
+def test_dashboard_cache_expires_after_ttl(client, monkeypatch):
+    _setup(monkeypatch)
+    user_id = _make_user()
+    _add_analysis(user_id)
+
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 1
+
+    # Written behind the cache's back: served stale until the TTL passes
+    _add_analysis(user_id)
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 1
+
+    FakeTime.now += app_module.DASHBOARD_CACHE_TTL
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 2
+
+
+def test_dashboard_refreshes_after_persist(client, monkeypatch):
+    _setup(monkeypatch)
+    user_id = _make_user()
+
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 0
+
+    app_module._persist_analysis(
+        user_id, "hello", {"label": "harsh", "confidence": 0.9}, {"issues": []}
+    )
+
+    assert client.get(f"/dashboard?user_id={user_id}").json["harsh"] == 1
+
+
+def test_dashboard_refreshes_after_history_clear(client, monkeypatch):
+    _setup(monkeypatch)
+    user_id = _make_user()
+    _add_analysis(user_id)
+
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 1
+
+    client.delete(f"/history/clear?user_id={user_id}")
+
+    assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 0
+
+
+def test_dashboard_skips_cache_write_if_invalidated_mid_query(client, monkeypatch):
+    _setup(monkeypatch)
+    user_id = _make_user()
+
+    # Simulate a persist committing while the GROUP BY is in flight
+    def invalidate(*args):
+        app_module.invalidate_dashboard(user_id)
+
+    event.listen(db.engine, "after_cursor_execute", invalidate)
+    try:
+        assert client.get(f"/dashboard?user_id={user_id}").json["total"] == 0
+    finally:
+        event.remove(db.engine, "after_cursor_execute", invalidate)
+
+    assert str(user_id) not in app_module._dashboard_cache
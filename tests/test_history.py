@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from database import db
+from models import User, EmailAnalysis
+
+
+def test_history_pages_through_rows_with_equal_timestamps(client):
+    user = User(name="A", email="a@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+
+    created = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(3):
+        db.session.add(EmailAnalysis(
+            user_id=user.id,
+            email_text=f"message {i}",
+            tone="neutral",
+            clarity_issues=[],
+            created_at=created
+        ))
+    db.session.commit()
+
+    seen = []
+    url = f"/history?user_id={user.id}&limit=1"
+    while True:
+        res = client.get(url)
+        assert res.status_code == 200
+        seen += [row["text"] for row in res.json]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        url = f"/history?user_id={user.id}&limit=1&before={cursor}"
+
+    assert sorted(seen) == ["message 0", "message 1", "message 2"]
+
+
+def test_history_rejects_malformed_cursor(client):
+    res = client.get("/history?user_id=1&before=not-a-cursor")
+    assert res.status_code == 400
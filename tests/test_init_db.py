@@ -0,0 +1,12 @@
+from app import upgrade_clarity_issues_column
+
+
+def test_init_db_creates_tables(app):
+    result = app.test_cli_runner().invoke(args=["init-db"])
+
+    assert result.exit_code == 0
+    assert "Database tables created." in result.output
+
+
+def test_clarity_issues_upgrade_skips_non_postgres(app):
+    assert upgrade_clarity_issues_column() is False
@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from sklearn.linear_model import LogisticRegression
+
+from services import tone_service
+from services.tone_service import MicroBatcher, linear_predict_proba
+
+SAMPLE_TEXTS = [
+    "Why have you not sent this yet? This is unacceptable.",
+    "Thanks for the help, could you please update the ticket?",
+    "The server is down again and nobody has responded.",
+    "Attached is the agenda for Tuesday's meeting.",
+]
+
+
+class GatedVectorizer:
+    """Blocks the first transform until released, so later calls queue up."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.gate = threading.Event()
+        self.batches = []
+
+    def transform(self, texts):
+        if not self.batches:
+            self.batches.append(list(texts))
+            self.gate.wait(timeout=5)
+        else:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise ValueError("transform failed")
+        return texts
+
+
+class LengthModel:
+    """Predicts "long" for texts over 5 characters, "short" otherwise."""
+
+    classes_ = np.array(["short", "long"])
+
+    def predict_proba(self, X):
+        return np.array([[0.2, 0.8] if len(t) > 5 else [0.9, 0.1] for t in X])
+
+
+def _run_concurrently(batcher, texts):
+    with ThreadPoolExecutor(len(texts)) as ex:
+        first = ex.submit(batcher.predict, texts[0])
+        # Wait until the worker is blocked on the first batch, then queue the rest
+        while not batcher.vectorizer.batches:
+            time.sleep(0.001)
+        rest = [ex.submit(batcher.predict, t) for t in texts[1:]]
+        while batcher._queue.qsize() < len(rest):
+            time.sleep(0.001)
+        batcher.vectorizer.gate.set()
+        return [first] + rest
+
+
+def test_batcher_sets_each_future_to_its_own_result():
+    batcher = MicroBatcher(LengthModel(), GatedVectorizer())
+
+    futures = _run_concurrently(batcher, ["hi", "a long one", "yo", "another long"])
+
+    assert [f.result() for f in futures] == [
+        ("short", 0.9), ("long", 0.8), ("short", 0.9), ("long", 0.8)
+    ]
+    # Everything queued behind the first text was scored as one batch
+    assert batcher.vectorizer.batches == [["hi"], ["a long one", "yo", "another long"]]
+
+
+def test_batcher_fans_exceptions_out_to_every_future():
+    batcher = MicroBatcher(LengthModel(), GatedVectorizer(fail=True))
+
+    futures = _run_concurrently(batcher, ["a", "b", "c"])
+
+    for f in futures:
+        with pytest.raises(ValueError, match="transform failed"):
+            f.result()
+
+
+def test_lone_request_is_not_held_back():
+    vectorizer = GatedVectorizer()
+    vectorizer.gate.set()
+    batcher = MicroBatcher(LengthModel(), vectorizer)
+
+    assert batcher.predict("hi", timeout=1.0) == ("short", 0.9)
+
+
+def test_batcher_restarts_worker_after_fork(monkeypatch):
+    vectorizer = GatedVectorizer()
+    vectorizer.gate.set()
+    batcher = MicroBatcher(LengthModel(), vectorizer)
+    assert batcher.predict("hi") == ("short", 0.9)
+    parent_queue = batcher._queue
+
+    # A forked child sees a new pid and has no worker thread
+    monkeypatch.setattr(tone_service.os, "getpid", lambda: -1)
+
+    assert batcher.predict("a long one") == ("long", 0.8)
+    assert batcher._pid == -1
+    assert batcher._queue is not parent_queue
+
+
+@pytest.mark.parametrize("loader", [
+    tone_service.get_business_model,
+    tone_service.get_complaint_model,
+])
+def test_linear_predict_proba_matches_sklearn_on_shipped_models(loader):
+    model, vectorizer = loader()
+    X = vectorizer.transform(SAMPLE_TEXTS)
+
+    np.testing.assert_allclose(
+        linear_predict_proba(model, X), model.predict_proba(X), rtol=1e-12, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("n_classes, solver", [
+    (2, "lbfgs"),       # binary: sigmoid
+    (2, "liblinear"),   # binary: sigmoid
+    (3, "liblinear"),   # one-vs-rest: normalized sigmoids
+])
+def test_linear_predict_proba_matches_sklearn_on_other_branches(n_classes, solver):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 5))
+    y = np.arange(60) % n_classes
+    try:
+        model = LogisticRegression(solver=solver).fit(X, y)
+    except ValueError:
+        # Newer sklearn dropped multiclass liblinear; the branch stays for
+        # models pickled by versions that still produced it
+        pytest.skip(f"{solver} can't fit {n_classes} classes in this sklearn")
+
+    np.testing.assert_allclose(
+        linear_predict_proba(model, X), model.predict_proba(X), rtol=1e-12, atol=1e-12
+    )
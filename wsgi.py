@@ -0,0 +1,13 @@
+from app import app
+from services.tone_service import get_business_model, get_complaint_model
+from services.clarity_service import readability_score
+
+# gunicorn imports this module once in the master (preload_app) before forking,
+# so anything loaded here is shared copy-on-write by every worker. Importing
+# app.py elsewhere (e.g. flask init-db) keeps the models lazy.
+get_business_model()
+get_complaint_model()
+readability_score("Load the syllable dictionaries before workers fork.")
+
+if __name__ == "__main__":
+    app.run()